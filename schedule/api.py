@@ -5,8 +5,15 @@ from django.utils.timezone import make_aware
 from ninja import Router
 from ninja.errors import HttpError
 from datetime import datetime, date as date_type
+from collections import OrderedDict, defaultdict
+from functools import lru_cache
+from itertools import groupby
+from operator import itemgetter
 import hashlib
 import json
+import math
+import re
+import threading
 
 from accounts.models import Company
 from .models import (
@@ -16,8 +23,10 @@ from .models import (
     EventRule,
     SpecialDay,
     DayDemandIndex,
+    DemandDayPayload,
     DefaultDemand,
     CompanyLocation,
+    BIG_MAX,
 )
 from .schemas import (
     CompanyLocationIn,
@@ -27,13 +36,10 @@ from .schemas import (
     SimpleDayAvailabilityOut,
     DemandDayIn,
     DemandDayOut,
-    DemandSlotOut,
     DefaultDemandIn,
     DefaultDemandOut,
-    DefaultDemandDayOut,
     DefaultDemandBulkIn,
     DefaultDemandWeekOut,
-    DefaultDemandWeekDayOut,
     ScheduleFullOut,
     ScheduleShiftOut,
     ShiftUpdateIn,
@@ -47,30 +53,74 @@ from .schemas import (
     GenerateResultOut,
 )
 from donkeybackend.security import DRFJWTAuth
-from .solver import run_solver
+from .solver import run_solver, slot_from_hhmm
 
 api = Router(tags=["schedule"], auth=DRFJWTAuth())
 #api = Router(tags=["schedule"])
 
+_AVAILABILITY_FIELDS = (
+    "employee_id",
+    "employee_name",
+    "date",
+    "experienced",
+    "hours_min",
+    "hours_max",
+    "available_slots",
+    "assigned_shift",
+)
+
+
 def _build_emp_availability(date_from, date_to) -> List[Dict[str, Any]]:
-    qs = Availability.objects.filter(date__gte=date_from, date__lte=date_to)
-    out = []
-    for a in qs:
-        out.append(dict(
-            employee_id=a.employee_id,
-            employee_name=a.employee_name,
-            date=a.date.isoformat(),
-            experienced=bool(a.experienced),
-            hours_min=int(a.hours_min or 0),
-            hours_max=int(a.hours_max or 1_000_000_000),
-            available_slots=list(a.available_slots or []),
-            assigned_shift=a.assigned_shift or None,
-        ))
+    # plain value rows are streamed; no model instances are built for the solver input
+    qs = (
+        Availability.objects
+        .filter(date__gte=date_from, date__lte=date_to)
+        .values(*_AVAILABILITY_FIELDS)
+    )
+    return [
+        {
+            "employee_id": r["employee_id"],
+            "employee_name": r["employee_name"],
+            "date": r["date"].isoformat(),
+            "experienced": bool(r["experienced"]),
+            "hours_min": int(r["hours_min"] or 0),
+            "hours_max": int(r["hours_max"] or BIG_MAX),
+            "available_slots": _solver_slots(r["available_slots"]),
+            "assigned_shift": r["assigned_shift"] or None,
+        }
+        for r in qs.iterator(chunk_size=2000)
+    ]
+
+
+def _solver_slots(raw_slots) -> List[Any]:
+    """Stored slots as run_solver Slot instances (parsed once, shared); unparsable entries are passed
+    through unchanged for run_solver to skip as before."""
+    out: List[Any] = []
+    for slot in raw_slots or []:
+        try:
+            out.append(slot_from_hhmm(slot["start"], slot["end"]))
+        except Exception:
+            out.append(slot)
     return out
 
+# "H", "HH", "H:MM", "HH.MM" (optionally padded) - the shapes clients actually send
+_HHMM_RE = re.compile(r"\s*([0-9]{1,2})(?:[:.]([0-9]{1,2}))?\s*")
+
+
 def _norm_hhmm(s: str) -> str:
     if not s:
         return s
+    return _norm_hhmm_cached(s)
+
+
+# slot times come from a small vocabulary, so most calls are a cache hit; errors are not cached
+@lru_cache(maxsize=4096)
+def _norm_hhmm_cached(s: str) -> str:
+    m = _HHMM_RE.fullmatch(s)
+    if m:
+        mm = m.group(2)
+        return f"{int(m.group(1)):02d}:{int(mm) if mm else 0:02d}"
+    # anything else goes through the original, more lenient parsing
     s = s.strip().replace(" ", "").replace(".", ":")
     if ":" in s:
         hh, mm = s.split(":", 1)
@@ -136,17 +186,31 @@ def _coerce_slots(val) -> list[dict]:
 
     return out
 
+@lru_cache(maxsize=4096)
+def _parse_slot_time(v: str) -> tuple[int, str]:
+    """Parse "HH:MM" into (minute of day, formatted "HH:MM"); raises like the original split/int parsing."""
+    # canonical "HH:MM" (what _coerce_slots produces): read the four digits directly
+    if len(v) == 5 and v[2] == ":":
+        a, b, c, d = v[0], v[1], v[3], v[4]
+        if "0" <= a <= "9" and "0" <= b <= "9" and "0" <= c <= "9" and "0" <= d <= "9":
+            return ((ord(a) - 48) * 10 + ord(b) - 48) * 60 + (ord(c) - 48) * 10 + ord(d) - 48, v
+    h, m = map(int, v.split(":"))
+    return h * 60 + m, f"{h:02d}:{m:02d}"
+
+
 def _validate_slots(slots: list[dict]) -> list[dict]:
+    # the same handful of times repeats across slots/days, so parsing is cached per string
     ok = []
+    append = ok.append
+    parse = _parse_slot_time
     for s in slots:
         try:
-            h1, m1 = map(int, s["start"].split(":"))
-            h2, m2 = map(int, s["end"].split(":"))
+            t1, start = parse(s["start"])
+            t2, end = parse(s["end"])
         except Exception:
             continue
-        t1, t2 = h1*60 + m1, h2*60 + m2
         if 0 <= t1 < t2 <= 1440:
-            ok.append({"start": f"{h1:02d}:{m1:02d}", "end": f"{h2:02d}:{m2:02d}"})
+            append({"start": start, "end": end})
     return ok
 
 
@@ -203,15 +267,15 @@ def upsert_availability_bulk(request, payload: BulkAvailabilityIn):
         saved.append(obj)
 
     return [
-        dict(
-            employee_id=o.employee_id,
-            employee_name=o.employee_name,
-            date=o.date.isoformat(),
-            experienced=o.experienced,
-            hours_min=o.hours_min,
-            hours_max=o.hours_max,
-            available_slots=o.available_slots,
-        ) for o in saved
+        {
+            "employee_id": o.employee_id,
+            "employee_name": o.employee_name,
+            "date": o.date.isoformat(),
+            "experienced": o.experienced,
+            "hours_min": o.hours_min,
+            "hours_max": o.hours_max,
+            "available_slots": o.available_slots,
+        } for o in saved
     ]
 
 # ------- GET: lista z filtrami + paginacja -------
@@ -243,15 +307,15 @@ def list_availability(
     items = list(qs[offset: offset + limit])
 
     results = [
-        dict(
-            employee_id=o.employee_id,
-            employee_name=o.employee_name,
-            date=o.date.isoformat(),
-            experienced=o.experienced,
-            hours_min=o.hours_min,
-            hours_max=o.hours_max,
-            available_slots=o.available_slots,
-        ) for o in items
+        {
+            "employee_id": o.employee_id,
+            "employee_name": o.employee_name,
+            "date": o.date.isoformat(),
+            "experienced": o.experienced,
+            "hours_min": o.hours_min,
+            "hours_max": o.hours_max,
+            "available_slots": o.available_slots,
+        } for o in items
     ]
 
     next_off = offset + limit if offset + limit < count else None
@@ -309,12 +373,18 @@ def get_availability_mobile(
 
 # ===================== DEMAND & SCHEDULE =====================
 
+# Same output as json.dumps(obj, sort_keys=True, ensure_ascii=False); the stored
+# content_hash/day_hash values depend on these exact bytes, so keep sha256 over them.
+_HASH_ENCODE = json.JSONEncoder(sort_keys=True, ensure_ascii=False).encode
+_sha256 = hashlib.sha256
+
+
 def _hash_payload(obj: Any) -> str:
     try:
-        s = json.dumps(obj, sort_keys=True, ensure_ascii=False)
+        s = _HASH_ENCODE(obj)
     except Exception:
         s = str(obj)
-    return hashlib.sha256(s.encode("utf-8")).hexdigest()
+    return _sha256(s.encode("utf-8")).hexdigest()
 
 # ---- Day-level helpers ----
 _DEF_LOC_ATTRS = ("location", "default_location", "restaurant", "org_location")
@@ -434,26 +504,7 @@ def create_location(request, payload: CompanyLocationIn) -> dict:
 
 
 def _canonicalize_day_items(items: List[Dict[str, Any]], date_s: str, location: str) -> List[Dict[str, Any]]:
-    canon = []
-    for it in (items or []):
-        start = _norm_hhmm(str(it.get("start", "")))
-        end   = _norm_hhmm(str(it.get("end", "")))
-        if not (start and end):
-            # skip invalid entries silently
-            continue
-        dmd = int(it.get("demand", 0) or 0)
-        ne  = bool(it.get("needs_experienced", False))
-        canon.append({
-            "date": date_s,
-            "location": location,
-            "start": start,
-            "end": end,
-            "demand": dmd,
-            "needs_experienced": ne,
-        })
-    # stable sort for hash
-    canon.sort(key=lambda x: (x["start"], x["end"], x["demand"], x.get("needs_experienced", False)))
-    return canon
+    return _stamp_day_items(_canonicalize_template_items(items), date_s, location)
 
 
 def _canonicalize_template_items(items: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
@@ -462,6 +513,7 @@ def _canonicalize_template_items(items: List[Dict[str, Any]]) -> List[Dict[str,
         start = _norm_hhmm(str(it.get("start", "")))
         end = _norm_hhmm(str(it.get("end", "")))
         if not (start and end):
+            # skip invalid entries silently
             continue
         dmd = int(it.get("demand", 0) or 0)
         ne = bool(it.get("needs_experienced", False))
@@ -471,10 +523,16 @@ def _canonicalize_template_items(items: List[Dict[str, Any]]) -> List[Dict[str,
             "demand": dmd,
             "needs_experienced": ne,
         })
+    # stable sort for hash
     canon.sort(key=lambda x: (x["start"], x["end"], x["demand"], x.get("needs_experienced", False)))
     return canon
 
 
+def _stamp_day_items(canon: List[Dict[str, Any]], date_s: str, location: str) -> List[Dict[str, Any]]:
+    """Turn already canonical template items into day items (same shape as _canonicalize_day_items)."""
+    return [{"date": date_s, "location": location, **it} for it in canon]
+
+
 def _strip_day_items(items: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
     out: List[Dict[str, Any]] = []
     for it in items or []:
@@ -493,26 +551,132 @@ def _day_hash(date_s: str, location: str, items: List[Dict[str, Any]]) -> str:
 
 
 def _group_payload_by_day_location(items: List[Dict[str, Any]]) -> Dict[tuple, List[Dict[str, Any]]]:
-    mp: Dict[tuple, List[Dict[str, Any]]] = {}
+    mp: defaultdict[tuple, List[Dict[str, Any]]] = defaultdict(list)
     for it in (items or []):
-        d = str(it.get("date"))
-        loc = str(it.get("location", ""))
+        get = it.get
+        d = str(get("date"))
         if not d:
             # skip
             continue
-        mp.setdefault((d, loc), []).append(it)
+        mp[(d, str(get("location", "")))].append(it)
     return mp
 
 
-def _populate_day_index_for_demand(demand: Demand):
+def _canonicalize_payload_by_day(items: List[Dict[str, Any]]) -> Dict[tuple, List[Dict[str, Any]]]:
+    """_canonicalize_day_items for every (date, location) group of a payload, with one sort for all groups.
+
+    Groups whose items are all invalid are kept with an empty list, like the per-group version.
+    """
+    groups: Dict[tuple, List[Dict[str, Any]]] = {}
+    records = []
+    for it in (items or []):
+        get = it.get
+        d = str(get("date"))
+        if not d:
+            continue
+        loc = str(get("location", ""))
+        groups.setdefault((d, loc), [])
+        start = _norm_hhmm(str(get("start", "")))
+        end = _norm_hhmm(str(get("end", "")))
+        if not (start and end):
+            continue
+        records.append((d, loc, start, end, int(get("demand", 0) or 0), bool(get("needs_experienced", False))))
+    # (date, location) first, then the same order _canonicalize_day_items uses inside a day
+    records.sort()
+    for key, rows in groupby(records, key=itemgetter(0, 1)):
+        groups[key] = [
+            {"date": d, "location": loc, "start": start, "end": end, "demand": dmd, "needs_experienced": ne}
+            for d, loc, start, end, dmd, ne in rows
+        ]
+    return groups
+
+
+# (demand_id, updated_at) -> {(date, location): (canonical day items, day hash)}
+_DAY_GROUPS_CACHE_SIZE = 256
+_day_groups_cache: "OrderedDict[tuple, Dict[tuple, tuple]]" = OrderedDict()
+# worker threads share the cache; OrderedDict reordering and eviction are not atomic
+_day_groups_lock = threading.Lock()
+
+
+def _cached_day_groups(key: tuple) -> Optional[Dict[tuple, tuple]]:
+    with _day_groups_lock:
+        groups = _day_groups_cache.get(key)
+        if groups is not None:
+            _day_groups_cache.move_to_end(key)
+        return groups
+
+
+def _remember_day_groups(key: tuple, groups: Dict[tuple, tuple]) -> None:
+    with _day_groups_lock:
+        _day_groups_cache[key] = groups
+        _day_groups_cache.move_to_end(key)
+        while len(_day_groups_cache) > _DAY_GROUPS_CACHE_SIZE:
+            _day_groups_cache.popitem(last=False)
+
+
+def _day_groups_for_demand(demand_id: int, updated_at, raw_payload) -> Dict[tuple, tuple]:
+    """Canonical items and day hash per (date, location) of a demand payload.
+
+    Results are cached on (demand_id, updated_at); every save of a Demand bumps
+    updated_at, so a stale payload is never served. A missing payload (None) is
+    grouped but not cached. Treat the result as read-only.
+    """
+    key = (demand_id, updated_at)
+    groups = _cached_day_groups(key)
+    if groups is not None:
+        return groups
+    groups = {
+        (d, loc): (canon, _day_hash(d, loc, canon))
+        for (d, loc), canon in _canonicalize_payload_by_day(raw_payload).items()
+    }
+    if raw_payload is not None:
+        _remember_day_groups(key, groups)
+    return groups
+
+
+def _sync_day_payloads(demand: Demand):
+    """Keep DemandDayPayload rows equal to the per-day groups of demand.raw_payload."""
+    rows = {}
+    for (d, loc), items in _group_payload_by_day_location(demand.raw_payload or []).items():
+        try:
+            day_dt = date_type.fromisoformat(d)
+        except ValueError:
+            # not addressable by day lookups anyway
+            continue
+        rows[(day_dt, loc)] = items
+    existing = {
+        (d, loc): items
+        for d, loc, items in DemandDayPayload.objects.filter(demand=demand).values_list("date", "location", "items")
+    }
+    if existing == rows:
+        return
+    DemandDayPayload.objects.filter(demand=demand).delete()
+    DemandDayPayload.objects.bulk_create(
+        [DemandDayPayload(demand=demand, date=d, location=loc, items=items) for (d, loc), items in rows.items()],
+        batch_size=500,
+    )
+
+
+def _populate_day_index_for_demand(demand: Demand, day_groups: Optional[Dict[tuple, tuple]] = None):
+    """Index every (date, location) of the demand payload.
+
+    Callers that just hashed the payload pass it as `day_groups`
+    ({(date, location): (canonical items, day hash)}) so it is not canonicalized and hashed again.
+    """
+    if day_groups is not None:
+        _remember_day_groups((demand.id, demand.updated_at), day_groups)
     try:
-        groups = _group_payload_by_day_location(demand.raw_payload or [])
-        for (d, loc), items in groups.items():
-            canon = _canonicalize_day_items(items, d, loc)
-            h = _day_hash(d, loc, canon)
-            DayDemandIndex.objects.get_or_create(
-                date=d, location=loc, day_hash=h, defaults={"demand": demand}
-            )
+        _sync_day_payloads(demand)
+        groups = _day_groups_for_demand(demand.id, demand.updated_at, demand.raw_payload)
+        # one INSERT; the (date, location, day_hash) unique constraint skips rows that already exist
+        DayDemandIndex.objects.bulk_create(
+            [
+                DayDemandIndex(date=d, location=loc, day_hash=h, demand=demand)
+                for (d, loc), (_canon, h) in groups.items()
+            ],
+            ignore_conflicts=True,
+            batch_size=500,
+        )
     except Exception:
         # best-effort; do not fail API if indexing fails
         pass
@@ -523,20 +687,17 @@ def _shift_uid(demand_id: int, a: Dict[str, Any]) -> str:
 
 
 def _with_ids(demand_id: int, assignments: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-    out: List[Dict[str, Any]] = []
-    for a in assignments or []:
-        b = dict(a)
-        b["id"] = _shift_uid(demand_id, a)
-        out.append(b)
+    """Stamp the shift id (same format as _shift_uid) onto fresh solver assignments, in place."""
+    prefix = f"D{demand_id}|"
+    out = assignments or []
+    for a in out:
+        a["id"] = f"{prefix}{a['date']}|{a['location']}|{a['start']}-{a['end']}"
     return out
 
 
 def _shift_base_dict(s: ScheduleShift) -> Dict[str, Any]:
     meta_raw = s.meta or {}
-    if isinstance(meta_raw, dict):
-        meta_dict = dict(meta_raw)
-    else:
-        meta_dict = {}
+    meta_dict = meta_raw if isinstance(meta_raw, dict) else {}
     return {
         "id": s.shift_uid,
         "date": s.date.isoformat(),
@@ -552,129 +713,236 @@ def _shift_base_dict(s: ScheduleShift) -> Dict[str, Any]:
     }
 
 
+_SHIFT_ROW_FIELDS = (
+    "shift_uid",
+    "date",
+    "location",
+    "start",
+    "end",
+    "demand_count",
+    "assigned_employees",
+    "needs_experienced",
+    "missing_minutes",
+    "meta",
+)
+
+
+def _shift_row_dict(r: Dict[str, Any]) -> Dict[str, Any]:
+    """Same output as _shift_base_dict, but built from a .values() row instead of a model instance."""
+    meta_raw = r["meta"] or {}
+    meta_dict = meta_raw if isinstance(meta_raw, dict) else {}
+    return {
+        "id": r["shift_uid"],
+        "date": r["date"].isoformat(),
+        "location": r["location"],
+        "start": r["start"],
+        "end": r["end"],
+        "demand": r["demand_count"],
+        "assigned_employees": list(r["assigned_employees"] or []),
+        "needs_experienced": bool(r["needs_experienced"]),
+        "missing_minutes": int(r["missing_minutes"] or 0),
+        "assigned_employees_detail": list(meta_dict.get("assigned_employees_detail", [])),
+        "missing_segments": list(meta_dict.get("missing_segments", [])),
+    }
+
+
 def _assignments_from_db(demand: Demand) -> List[Dict[str, Any]]:
-    out: List[Dict[str, Any]] = []
-    for s in demand.shifts.all().order_by("date", "location", "start", "end"):
-        out.append(_shift_base_dict(s))
-    return out
+    qs = (
+        ScheduleShift.objects.filter(demand_id=demand.id)
+        .order_by("date", "location", "start", "end")
+        .values(*_SHIFT_ROW_FIELDS)
+    )
+    return [_shift_row_dict(r) for r in qs.iterator(chunk_size=500)]
 
 
 def _assignments_for_day_from_db(demand: Demand, day: str, location: Optional[str] = None) -> List[Dict[str, Any]]:
-    qs = demand.shifts.filter(date=day)
+    qs = ScheduleShift.objects.filter(demand_id=demand.id, date=day)
     if location:
         qs = qs.filter(location=location)
-    out: List[Dict[str, Any]] = []
-    for s in qs.order_by("location", "start"):
-        out.append(_shift_base_dict(s))
-    return out
+    qs = qs.order_by("location", "start").values(*_SHIFT_ROW_FIELDS)
+    return [_shift_row_dict(r) for r in qs.iterator(chunk_size=500)]
 
 
 def _get_or_build_day_index(day: str, location: str) -> DayDemandIndex | None:
-    # Try existing index first
-    idx = DayDemandIndex.objects.filter(date=day, location=location).order_by("-id").first()
+    # Try existing index first; callers go on to idx.demand, so fetch it in the same query
+    idx = (
+        DayDemandIndex.objects.filter(date=day, location=location)
+        .select_related("demand")
+        .order_by("-id")
+        .first()
+    )
     if idx:
         return idx
-    # Lazy backfill by scanning existing demands in range
     from datetime import date as _date
     try:
         day_dt = _date.fromisoformat(day)
     except Exception:
         return None
-    candidates = Demand.objects.filter(date_from__lte=day_dt, date_to__gte=day_dt).order_by("-created_at")
-    for d in candidates:
-        groups = _group_payload_by_day_location(d.raw_payload or [])
-        items = groups.get((day, location))
-        if not items:
-            continue
+    # Lazy backfill: newest demand that has a stored slice for this day
+    row = (
+        DemandDayPayload.objects.filter(date=day_dt, location=location)
+        .order_by("-demand__created_at", "-demand_id")
+        .values_list("demand_id", "items")
+        .first()
+    )
+    if row:
+        demand_id, items = row
         canon = _canonicalize_day_items(items, day, location)
-        h = _day_hash(day, location, canon)
-        try:
-            idx, _ = DayDemandIndex.objects.get_or_create(date=day, location=location, day_hash=h, defaults={"demand": d})
+        idx = _index_day(day, location, _day_hash(day, location, canon), demand_id)
+        if idx:
+            return idx
+    # Demands saved before day slices existed: scan their payloads
+    candidates = list(
+        Demand.objects.filter(date_from__lte=day_dt, date_to__gte=day_dt, day_payloads__isnull=True)
+        .order_by("-created_at")
+        .values_list("id", "updated_at")
+    )
+    # payloads are only loaded (in one query) for demands not already grouped in the cache
+    with _day_groups_lock:
+        missing = [demand_id for demand_id, updated_at in candidates if (demand_id, updated_at) not in _day_groups_cache]
+    payloads = {}
+    if missing:
+        payloads = dict(Demand.objects.filter(id__in=missing).values_list("id", "raw_payload"))
+    for demand_id, updated_at in candidates:
+        groups = _cached_day_groups((demand_id, updated_at))
+        if groups is None:
+            if demand_id not in payloads:
+                # evicted since the check above (other threads share the cache); load just this one
+                payloads[demand_id] = (
+                    Demand.objects.filter(id=demand_id).values_list("raw_payload", flat=True).first()
+                )
+            groups = _day_groups_for_demand(demand_id, updated_at, payloads[demand_id])
+        found = groups.get((day, location))
+        if not found:
+            continue
+        idx = _index_day(day, location, found[1], demand_id)
+        if idx:
             return idx
-        except Exception:
-            # may race; retry fetch
-            idx = DayDemandIndex.objects.filter(date=day, location=location, day_hash=h).order_by("-id").first()
-            if idx:
-                return idx
     return None
 
 
+def _index_day(day: str, location: str, h: str, demand_id: int) -> DayDemandIndex | None:
+    try:
+        idx, _ = DayDemandIndex.objects.get_or_create(
+            date=day, location=location, day_hash=h, defaults={"demand_id": demand_id}
+        )
+        return idx
+    except Exception:
+        # may race; retry fetch
+        return DayDemandIndex.objects.filter(date=day, location=location, day_hash=h).order_by("-id").first()
+
+
+def _default_items(obj: DefaultDemand) -> List[Dict[str, Any]]:
+    # canonical form is stored on write; rows saved before that (or created directly) fall back
+    return obj.items_canonical or _canonicalize_template_items(obj.items or [])
+
+
+def _load_default_templates(company: Company, location: str) -> Dict[Optional[int], List[Dict[str, Any]]]:
+    """Canonical default items per weekday (None = general template) in one query; newest row wins."""
+    rows = (
+        DefaultDemand.objects.filter(company=company, location=location)
+        .order_by("-updated_at", "-id")
+        .values_list("weekday", "items_canonical", "items")
+    )
+    templates: Dict[Optional[int], List[Dict[str, Any]]] = {}
+    for weekday, items_canonical, items in rows:
+        if weekday not in templates:
+            templates[weekday] = items_canonical or _canonicalize_template_items(items or [])
+    return templates
+
+
+def _resolve_default_template(
+    templates: Dict[Optional[int], List[Dict[str, Any]]], weekday: Optional[int] = None
+) -> List[Dict[str, Any]]:
+    if weekday is not None and weekday in templates:
+        return templates[weekday]
+    return templates.get(None, [])
+
+
 def _get_default_template(company: Company, location: str, weekday: Optional[int] = None) -> List[Dict[str, Any]]:
-    base_qs = DefaultDemand.objects.filter(company=company, location=location)
-    if weekday is not None:
-        obj = base_qs.filter(weekday=weekday).order_by("-updated_at").first()
-        if obj:
-            return _canonicalize_template_items(obj.items or [])
-    obj = base_qs.filter(weekday__isnull=True).order_by("-updated_at").first()
-    if obj:
-        return _canonicalize_template_items(obj.items or [])
-    return []
+    return _resolve_default_template(_load_default_templates(company, location), weekday)
 
 
 def _list_default_days(company: Company, location: str) -> List[Dict[str, Any]]:
+    # entries already have the DefaultDemandDayOut shape (canonical items); endpoints return them as-is
+    # and leave validation to the response schema instead of building throwaway Schema objects first
     defaults = DefaultDemand.objects.filter(company=company, location=location).order_by("weekday", "id")
     out: List[Dict[str, Any]] = []
     for obj in defaults:
-        canon = _canonicalize_template_items(obj.items or [])
-        out.append(dict(
-            weekday=obj.weekday,
-            items=canon,
-            updated_at=timezone.localtime(obj.updated_at).isoformat(),
-        ))
+        canon = _default_items(obj)
+        out.append({
+            "weekday": obj.weekday,
+            "items": canon,
+            "updated_at": timezone.localtime(obj.updated_at).isoformat(),
+        })
     return out
 
 
 def _build_default_week(company: Company, location: str) -> List[Dict[str, Any]]:
-    qs = DefaultDemand.objects.filter(company=company, location=location).order_by("-updated_at", "-id")
+    rows = (
+        DefaultDemand.objects.filter(company=company, location=location)
+        .order_by("-updated_at", "-id")
+        .values_list("weekday", "items_canonical", "items", "updated_at")
+    )
     by_weekday: dict[int, Dict[str, Any]] = {}
     fallback: Optional[Dict[str, Any]] = None
 
-    for obj in qs:
-        canon = _canonicalize_template_items(obj.items or [])
-        entry = dict(
-            items=canon,
-            updated_at=timezone.localtime(obj.updated_at).isoformat() if obj.updated_at else None,
-        )
-        if obj.weekday is None:
-            if fallback is None:
-                fallback = entry
+    for weekday, items_canonical, items, updated_at in rows:
+        # newest row wins per weekday; older duplicates need no canonicalization
+        if weekday is None:
+            if fallback is not None:
+                continue
+        elif weekday in by_weekday:
+            continue
+        entry = {
+            "items": items_canonical or _canonicalize_template_items(items or []),
+            "updated_at": timezone.localtime(updated_at).isoformat() if updated_at else None,
+        }
+        if weekday is None:
+            fallback = entry
         else:
-            if obj.weekday not in by_weekday:
-                by_weekday[obj.weekday] = entry
+            by_weekday[weekday] = entry
 
+    if fallback is None and not by_weekday:
+        # nothing configured for this location: seven empty days, nothing to serialize
+        return [{"weekday": weekday, "items": [], "updated_at": None, "inherited": False} for weekday in range(7)]
+
+    # items are canonical dicts already; build the DefaultDemandWeekDayOut shape directly
     def _serialize_items(items: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-        return [DemandSlotOut(**item).dict() for item in (items or [])]
+        return [
+            {
+                "start": it["start"],
+                "end": it["end"],
+                "demand": int(it["demand"]),
+                "needs_experienced": bool(it["needs_experienced"]),
+            }
+            for it in (items or [])
+        ]
 
     out: List[Dict[str, Any]] = []
     for weekday in range(7):
         if weekday in by_weekday:
             data = by_weekday[weekday]
-            out.append(
-                DefaultDemandWeekDayOut(
-                    weekday=weekday,
-                    items=_serialize_items(data["items"]),
-                    updated_at=data["updated_at"],
-                    inherited=False,
-                ).dict()
-            )
+            out.append({
+                "weekday": weekday,
+                "items": _serialize_items(data["items"]),
+                "updated_at": data["updated_at"],
+                "inherited": False,
+            })
         elif fallback is not None:
-            out.append(
-                DefaultDemandWeekDayOut(
-                    weekday=weekday,
-                    items=_serialize_items(fallback["items"]),
-                    updated_at=fallback["updated_at"],
-                    inherited=True,
-                ).dict()
-            )
+            out.append({
+                "weekday": weekday,
+                "items": _serialize_items(fallback["items"]),
+                "updated_at": fallback["updated_at"],
+                "inherited": True,
+            })
         else:
-            out.append(
-                DefaultDemandWeekDayOut(
-                    weekday=weekday,
-                    items=[],
-                    updated_at=None,
-                    inherited=False,
-                ).dict()
-            )
+            out.append({
+                "weekday": weekday,
+                "items": [],
+                "updated_at": None,
+                "inherited": False,
+            })
 
     return out
 
@@ -684,11 +952,12 @@ def _upsert_default_day(company: Company, location: str, weekday: Optional[int],
         company=company,
         location=location,
         weekday=weekday,
-        defaults={"items": canon_items},
+        defaults={"items": canon_items, "items_canonical": canon_items},
     )
     if not created:
         obj.items = canon_items
-        update_fields = ["items", "updated_at"]
+        obj.items_canonical = canon_items
+        update_fields = ["items", "items_canonical", "updated_at"]
         if obj.company_id != company.id:
             obj.company = company
             update_fields.append("company")
@@ -782,12 +1051,13 @@ def save_day_demand(request, payload: DemandDayIn):
     ])
     obj.shifts.all().delete()
 
-    _populate_day_index_for_demand(obj)
+    # single-day payload: its day hash is the content hash computed above
+    _populate_day_index_for_demand(obj, {(day, loc): (canon_items, content_hash)})
 
     return dict(
         date=day,
         location=loc,
-        items=[DemandSlotOut(**item).dict() for item in _strip_day_items(canon_items)],
+        items=_strip_day_items(canon_items),
         content_hash=obj.content_hash,
     )
 
@@ -822,13 +1092,13 @@ def get_day_demand(request, date: str, location: Optional[str] = None) -> Dict[s
     idx = _get_or_build_day_index(day, loc)
     if idx:
         demand = idx.demand
-        groups = _group_payload_by_day_location(demand.raw_payload or [])
-        day_items = _canonicalize_day_items(groups.get((day, loc), []), day, loc)
+        groups = _day_groups_for_demand(demand.id, demand.updated_at, demand.raw_payload)
+        day_items, day_h = groups.get((day, loc), ([], None))
         return dict(
             date=day,
             location=loc,
-            items=[DemandSlotOut(**item).dict() for item in _strip_day_items(day_items)],
-            content_hash=_day_hash(day, loc, day_items) if day_items else demand.content_hash,
+            items=_strip_day_items(day_items),
+            content_hash=day_h if day_items else demand.content_hash,
         )
 
     template = _get_default_template(company, loc, weekday)
@@ -836,7 +1106,7 @@ def get_day_demand(request, date: str, location: Optional[str] = None) -> Dict[s
         return dict(
             date=day,
             location=loc,
-            items=[DemandSlotOut(**item).dict() for item in template],
+            items=template,
             content_hash=None,
         )
 
@@ -869,14 +1139,7 @@ def save_default_demand(request, payload: DefaultDemandIn):
     defaults = _list_default_days(company, loc)
     return dict(
         location=loc,
-        defaults=[
-            DefaultDemandDayOut(
-                weekday=entry["weekday"],
-                items=[DemandSlotOut(**item).dict() for item in entry["items"]],
-                updated_at=entry["updated_at"],
-            ).dict()
-            for entry in defaults
-        ],
+        defaults=defaults,
     )
 
 
@@ -899,25 +1162,36 @@ def save_default_demand_bulk(request, payload: DefaultDemandBulkIn):
     if not payload.defaults:
         raise HttpError(400, "Przekaż przynajmniej jeden dzień tygodnia")
 
+    canon_by_weekday: Dict[Optional[int], List[Dict[str, Any]]] = {}
     for day in payload.defaults:
         weekday = _normalize_weekday(day.weekday)
         raw_items = [dict(x) for x in (day.items or [])]
         canon = _canonicalize_template_items(raw_items)
         if not canon:
             raise HttpError(400, f"Lista zmian dla dnia tygodnia {weekday if weekday is not None else '*'} jest pusta")
-        _upsert_default_day(company, loc, weekday, canon)
+        # a weekday given twice: the later entry wins, as with one save per entry
+        canon_by_weekday[weekday] = canon
+
+    # NULL never conflicts in the unique index, so the general template keeps the get-or-update path;
+    # concrete weekdays are written in one INSERT ... ON CONFLICT DO UPDATE
+    general = canon_by_weekday.pop(None, None)
+    if general is not None:
+        _upsert_default_day(company, loc, None, general)
+    if canon_by_weekday:
+        DefaultDemand.objects.bulk_create(
+            [
+                DefaultDemand(company=company, location=loc, weekday=weekday, items=canon, items_canonical=canon)
+                for weekday, canon in canon_by_weekday.items()
+            ],
+            update_conflicts=True,
+            unique_fields=["company", "location", "weekday"],
+            update_fields=["items", "items_canonical", "updated_at"],
+        )
 
     defaults = _list_default_days(company, loc)
     return dict(
         location=loc,
-        defaults=[
-            DefaultDemandDayOut(
-                weekday=entry["weekday"],
-                items=[DemandSlotOut(**item).dict() for item in entry["items"]],
-                updated_at=entry["updated_at"],
-            ).dict()
-            for entry in defaults
-        ],
+        defaults=defaults,
     )
 
 
@@ -968,14 +1242,7 @@ def get_default_demand(request, location: Optional[str] = None, weekday: Optiona
 
     return dict(
         location=loc,
-        defaults=[
-            DefaultDemandDayOut(
-                weekday=entry["weekday"],
-                items=[DemandSlotOut(**item).dict() for item in entry["items"]],
-                updated_at=entry["updated_at"],
-            ).dict()
-            for entry in defaults
-        ],
+        defaults=defaults,
     )
 
 
@@ -1022,56 +1289,74 @@ def list_demands(request, limit: int = 50, offset: int = 0) -> Dict[str, Any]:
     return {"count": count, "next": next_off, "previous": prev_off, "results": out}
 
 
+def _load_rule_map(date_from, date_to) -> Dict[tuple, tuple]:
+    """(date_iso, location) -> ((mode, value, min, max, needs_exp), ...) for active rules in range, in one query."""
+    # Preload active special days + rules within range, as plain tuples
+    sd_rows = SpecialDay.objects.filter(
+        active=True,
+        date__gte=date_from,
+        date__lte=date_to,
+        rule__active=True,
+    ).order_by("created_at", "id").values_list(
+        "date",
+        "location",
+        "rule__mode",
+        "rule__value",
+        "rule__min_demand",
+        "rule__max_demand",
+        "rule__needs_experienced_default",
+    )
+
+    # wildcard stored with location ""
+    map_by_key: defaultdict[tuple[str, str], list] = defaultdict(list)
+    for sd_date, sd_loc, *rule in sd_rows:
+        map_by_key[(sd_date.isoformat(), sd_loc or "")].append(tuple(rule))
+    return {k: tuple(v) for k, v in map_by_key.items()}
+
+
 def _apply_special_rules_to_demand(items: List[Dict[str, Any]], date_from, date_to) -> List[Dict[str, Any]]:
     """Apply SpecialDay/EventRule transformations to incoming demand items without mutating originals.
     - Exact (date+location) rules take precedence; then wildcard (date+"") rules are applied if present.
     - Multiple rules for the same key are applied in creation order.
     """
-    import math
-    # Preload active special days + rules within range
-    sd_qs = SpecialDay.objects.select_related("rule").filter(
-        active=True,
-        date__gte=date_from,
-        date__lte=date_to,
-        rule__active=True,
-    ).order_by("created_at", "id")
+    map_by_key = _load_rule_map(date_from, date_to)
 
-    # Build mapping: (date_iso, location) -> [rule,...]; wildcard stored with location ""
-    map_by_key: dict[tuple[str, str], list] = {}
-    for sd in sd_qs:
-        k = (sd.date.isoformat(), (sd.location or ""))
-        map_by_key.setdefault(k, []).append(sd.rule)
+    mode_override = EventRule.MODE_OVERRIDE
+    # locals for the per-slot loop below
+    _ceil, _int, _float, _round, _max, _min = math.ceil, int, float, round, max, min
 
     def apply_rules_for(date_s: str, location: str, base_demand: int, needs_exp: bool) -> tuple[int, bool]:
         # Gather rules: exact first, then wildcard
         rules = []
-        exact = map_by_key.get((date_s, location or ""), [])
-        wildcard = map_by_key.get((date_s, ""), [])
+        exact = map_by_key.get((date_s, location or ""), ())
+        wildcard = map_by_key.get((date_s, ""), ())
         # exact should override wildcard precedence; we apply wildcard first, then exact
         rules.extend(wildcard)
         rules.extend(exact)
-        d_val = int(base_demand)
+        d_val = _int(base_demand)
         nexp = bool(needs_exp)
-        for r in rules:
-            if r.mode == r.MODE_OVERRIDE:
+        for mode, value, min_demand, max_demand, needs_exp_default in rules:
+            if mode == mode_override:
                 try:
-                    d_val = int(round(r.value))
+                    d_val = _int(_round(value))
                 except Exception:
-                    d_val = int(r.value)
+                    d_val = _int(value)
             else:  # multiplier
                 try:
-                    d_val = int(math.ceil(d_val * float(r.value)))
+                    d_val = _int(_ceil(d_val * _float(value)))
                 except Exception:
                     d_val = d_val
-            if r.min_demand is not None:
-                d_val = max(d_val, int(r.min_demand))
-            if r.max_demand is not None:
-                d_val = min(d_val, int(r.max_demand))
-            if r.needs_experienced_default:
+            if min_demand is not None:
+                d_val = _max(d_val, _int(min_demand))
+            if max_demand is not None:
+                d_val = _min(d_val, _int(max_demand))
+            if needs_exp_default:
                 nexp = True
-        d_val = max(0, int(d_val))
+        d_val = _max(0, _int(d_val))
         return d_val, nexp
 
+    # payloads repeat the same (day, location, demand, flag) combinations many times over
+    memo: dict[tuple, tuple[int, bool]] = {}
     out: List[Dict[str, Any]] = []
     for it in (items or []):
         a = dict(it)
@@ -1079,7 +1364,11 @@ def _apply_special_rules_to_demand(items: List[Dict[str, Any]], date_from, date_
         a_loc = a.get("location", "")
         d0 = int(a.get("demand", 0) or 0)
         n0 = bool(a.get("needs_experienced", False))
-        d_new, n_new = apply_rules_for(str(a_date), str(a_loc), d0, n0)
+        key = (str(a_date), str(a_loc), d0, n0)
+        res = memo.get(key)
+        if res is None:
+            res = memo[key] = apply_rules_for(*key)
+        d_new, n_new = res
         a["demand"] = d_new
         if n_new:
             a["needs_experienced"] = True
@@ -1098,24 +1387,12 @@ def _ensure_schedule_for_demand(d: Demand, force: bool = False) -> tuple[List[Di
         _populate_day_index_for_demand(d)
         return _assignments_from_db(d), None
 
-    # When forcing, clear existing
-    if force and d.shifts.exists():
+    # When forcing, clear existing (a single DELETE; no separate exists() round-trip)
+    if force:
         d.shifts.all().delete()
 
     # Build availability input from DB for the demand date range
-    avail_qs = Availability.objects.filter(date__gte=d.date_from, date__lte=d.date_to)
-    emp_avail = []
-    for a in avail_qs:
-        emp_avail.append(dict(
-            employee_id=a.employee_id,
-            employee_name=a.employee_name,
-            date=a.date.isoformat(),
-            experienced=bool(a.experienced),
-            hours_min=int(a.hours_min or 0),
-            hours_max=int(a.hours_max or 1_000_000_000),
-            available_slots=list(a.available_slots or []),
-            assigned_shift=a.assigned_shift or None,
-        ))
+    emp_avail = _build_emp_availability(d.date_from, d.date_to)
 
     # Apply special rules (holidays/events) before solving
     demand_payload = _apply_special_rules_to_demand(d.raw_payload or [], d.date_from, d.date_to)
@@ -1316,21 +1593,26 @@ def get_day_schedule(request, day: str, location: Optional[str] = None) -> List[
         raise HttpError(401, "Unauthorized")
     loc = _infer_location(request, location)
     # If we already have persisted shifts for that date/location across any demand, return them
-    shifts_qs = ScheduleShift.objects.filter(date=day, location=loc)
-    if shifts_qs.exists():
-        return [
-            dict(
-                id=s.shift_uid,
-                date=s.date.isoformat(),
-                location=s.location,
-                start=s.start,
-                end=s.end,
-                demand=s.demand_count,
-                assigned_employees=list(s.assigned_employees or []),
-                needs_experienced=bool(s.needs_experienced),
-                missing_minutes=int(s.missing_minutes or 0),
-            ) for s in shifts_qs.order_by("start", "end")
-        ]
+    # (one query: fetch them directly instead of exists() followed by the same filter)
+    shifts = [
+        dict(
+            id=s.shift_uid,
+            date=s.date.isoformat(),
+            location=s.location,
+            start=s.start,
+            end=s.end,
+            demand=s.demand_count,
+            assigned_employees=list(s.assigned_employees or []),
+            needs_experienced=bool(s.needs_experienced),
+            missing_minutes=int(s.missing_minutes or 0),
+        )
+        for s in ScheduleShift.objects.filter(date=day, location=loc).order_by("start", "end").only(
+            "shift_uid", "date", "location", "start", "end", "demand_count",
+            "assigned_employees", "needs_experienced", "missing_minutes",
+        )
+    ]
+    if shifts:
+        return shifts
     # No persisted shifts — try to find a weekly demand through DayDemandIndex
     idx = _get_or_build_day_index(day, loc)
     if not idx:
@@ -1400,7 +1682,7 @@ def generate_day(request, payload: GenerateDayIn):
         content_hash=content_hash,
         defaults=dict(name=f"{day} {loc}", raw_payload=canon_items, date_from=day_dt, date_to=day_dt)
     )
-    _populate_day_index_for_demand(d)
+    _populate_day_index_for_demand(d, {(day, loc): (canon_items, h)})
 
     if payload.persist is False:
         emp_avail = _build_emp_availability(day_dt, day_dt)
@@ -1440,20 +1722,29 @@ def generate_range(request, payload: GenerateRangeIn):
     if end < start:
         raise HttpError(400, "date_to must be >= date_from")
     full_items: List[Dict[str, Any]] = []
+    # canonical (date-free) template per weekday; with explicit items there is only one (key None)
+    canon_by_weekday: Dict[Optional[int], List[Dict[str, Any]]] = {}
+    templates: Optional[Dict[Optional[int], List[Dict[str, Any]]]] = None
     cur = start
     while cur <= end:
         day_s = cur.isoformat()
-        # build canon for the day using templates (they may omit needs_experienced)
-        if template_items is not None:
-            source_items = template_items
-        else:
-            source_items = _get_default_template(company, loc, cur.weekday())
-            if not source_items:
-                raise HttpError(400, f"Brak domyślnego zapotrzebowania dla dnia {day_s}")
-        day_canon = _canonicalize_day_items(source_items, day_s, loc)
-        if not day_canon:
+        key = None if template_items is not None else cur.weekday()
+        canon = canon_by_weekday.get(key)
+        if canon is None:
+            # build canon for the day using templates (they may omit needs_experienced)
+            if template_items is not None:
+                source_items = template_items
+            else:
+                if templates is None:
+                    templates = _load_default_templates(company, loc)
+                source_items = _resolve_default_template(templates, key)
+                if not source_items:
+                    raise HttpError(400, f"Brak domyślnego zapotrzebowania dla dnia {day_s}")
+            canon = _canonicalize_template_items(source_items)
+            canon_by_weekday[key] = canon
+        if not canon:
             raise HttpError(400, f"Lista zmian dla dnia {day_s} jest pusta")
-        full_items.extend(day_canon)
+        full_items.extend(_stamp_day_items(canon, day_s, loc))
         cur += timedelta(days=1)
 
     # Create/find Demand for full range (idempotent via content hash)
@@ -0,0 +1,55 @@
+from django.db import migrations, models
+
+
+def _norm_hhmm(s):
+    if not s:
+        return s
+    s = s.strip().replace(" ", "").replace(".", ":")
+    if ":" in s:
+        hh, mm = s.split(":", 1)
+        return f"{int(hh):02d}:{int(mm):02d}"
+    return f"{int(s):02d}:00"
+
+
+def _canonicalize(items):
+    canon = []
+    for it in items or []:
+        start = _norm_hhmm(str(it.get("start", "")))
+        end = _norm_hhmm(str(it.get("end", "")))
+        if not (start and end):
+            continue
+        canon.append({
+            "start": start,
+            "end": end,
+            "demand": int(it.get("demand", 0) or 0),
+            "needs_experienced": bool(it.get("needs_experienced", False)),
+        })
+    canon.sort(key=lambda x: (x["start"], x["end"], x["demand"], x["needs_experienced"]))
+    return canon
+
+
+def backfill_items_canonical(apps, schema_editor):
+    DefaultDemand = apps.get_model("schedule", "DefaultDemand")
+    for obj in DefaultDemand.objects.all().only("id", "items"):
+        try:
+            canon = _canonicalize(obj.items)
+        except (TypeError, ValueError, AttributeError):
+            # leave empty; readers canonicalize `items` on the fly
+            continue
+        DefaultDemand.objects.filter(pk=obj.pk).update(items_canonical=canon)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("schedule", "0003_alter_defaultdemand_options_defaultdemand_company_and_more"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="defaultdemand",
+            name="items_canonical",
+            field=models.JSONField(blank=True, default=list),
+        ),
+        migrations.RunPython(backfill_items_canonical, migrations.RunPython.noop),
+    ]
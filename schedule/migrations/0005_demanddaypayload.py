@@ -0,0 +1,67 @@
+import django.db.models.deletion
+from datetime import date
+from django.db import migrations, models
+
+
+def backfill_day_payloads(apps, schema_editor):
+    Demand = apps.get_model("schedule", "Demand")
+    DemandDayPayload = apps.get_model("schedule", "DemandDayPayload")
+    for demand in Demand.objects.all().only("id", "raw_payload").iterator(chunk_size=200):
+        groups = {}
+        for it in demand.raw_payload or []:
+            if not isinstance(it, dict):
+                continue
+            try:
+                day = date.fromisoformat(str(it.get("date")))
+            except ValueError:
+                continue
+            groups.setdefault((day, str(it.get("location", ""))), []).append(it)
+        DemandDayPayload.objects.bulk_create(
+            [
+                DemandDayPayload(demand_id=demand.id, date=day, location=loc, items=items)
+                for (day, loc), items in groups.items()
+            ],
+            batch_size=500,
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("schedule", "0004_defaultdemand_items_canonical"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="DemandDayPayload",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("date", models.DateField()),
+                ("location", models.CharField(blank=True, default="", max_length=255)),
+                ("items", models.JSONField(default=list)),
+                (
+                    "demand",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="day_payloads",
+                        to="schedule.demand",
+                    ),
+                ),
+            ],
+            options={
+                "unique_together": {("demand", "date", "location")},
+                "indexes": [
+                    models.Index(fields=["date", "location"], name="schedule_de_date_5521dd_idx"),
+                ],
+            },
+        ),
+        migrations.RunPython(backfill_day_payloads, migrations.RunPython.noop),
+    ]
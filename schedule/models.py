@@ -156,6 +156,24 @@ class DayDemandIndex(models.Model):
         return f"DayIndex[{self.date} {self.location} #{self.day_hash[:8]}] -> Demand {self.demand_id}"
 
 
+# ===== Per-day slices of Demand.raw_payload (direct lookup for the day index backfill) =====
+class DemandDayPayload(models.Model):
+    demand = models.ForeignKey(Demand, related_name="day_payloads", on_delete=models.CASCADE)
+    date = models.DateField()
+    location = models.CharField(max_length=255, blank=True, default="")
+    # surowe pozycje raw_payload dla tego dnia/lokalizacji
+    items = models.JSONField(default=list)
+
+    class Meta:
+        unique_together = ("demand", "date", "location")
+        indexes = [
+            models.Index(fields=["date", "location"]),
+        ]
+
+    def __str__(self):
+        return f"DayPayload[{self.date} {self.location}] -> Demand {self.demand_id}"
+
+
 class CompanyLocation(models.Model):
     company = models.ForeignKey(Company, on_delete=models.CASCADE, related_name="schedule_locations")
     name = models.CharField(max_length=255)
@@ -175,6 +193,8 @@ class DefaultDemand(models.Model):
     location = models.CharField(max_length=255)
     weekday = models.PositiveSmallIntegerField(null=True, blank=True)
     items = models.JSONField(default=list)
+    # items po kanonizacji (zapisywane razem z items); pusta lista = nie policzono, czytaj z items
+    items_canonical = models.JSONField(default=list, blank=True)
 
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -1,21 +1,39 @@
 from __future__ import annotations
-from typing import List, Dict, Any, Tuple
+from typing import List, Dict, Any, Optional, Tuple
+from bisect import bisect_right
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from functools import lru_cache
 from ortools.sat.python import cp_model
-import itertools
 
 SLICE_MIN = 30
 
+# "HH:MM" for every minute of the day (and 24:00); slice bounds are formatted by lookup
+_HHMM_BY_MIN = [f"{t // 60:02d}:{t % 60:02d}" for t in range(24 * 60 + 1)]
 
+
+@lru_cache(maxsize=4096)
 def _to_minutes(hhmm: str) -> int:
     h, m = map(int, hhmm.split(":"))
     return h * 60 + m
 
 
+@dataclass(frozen=True, slots=True)
+class Slot:
+    """Availability slot already in minutes; run_solver takes it in place of a {"start", "end"} dict."""
+    start_min: int
+    end_min: int
+
+
+@lru_cache(maxsize=4096)
+def slot_from_hhmm(start: str, end: str) -> Slot:
+    # slots are immutable, so equal ("HH:MM", "HH:MM") pairs share one instance
+    return Slot(_to_minutes(start), _to_minutes(end))
+
+
 def _to_hhmm(total_minutes: int) -> str:
-    total_minutes = max(0, int(total_minutes))
-    h = (total_minutes // 60) % 24
-    m = total_minutes % 60
-    return f"{h:02d}:{m:02d}"
+    # wraps past midnight, like (minutes // 60) % 24
+    return _HHMM_BY_MIN[max(0, int(total_minutes)) % 1440]
 
 
 def _overlaps(a_start, a_end, b_start, b_end) -> bool:
@@ -26,65 +44,220 @@ def _contains(slot_start, slot_end, s_start, s_end) -> bool:
     return slot_start <= s_start and s_end <= slot_end
 
 
+def _union_minutes(intervals: List[Tuple[int, int]]) -> int:
+    """Total length of the union of [start, end) intervals."""
+    total = 0
+    cur_start = cur_end = None
+    for st, en in sorted(intervals):
+        if cur_end is None or st > cur_end:
+            if cur_end is not None:
+                total += cur_end - cur_start
+            cur_start, cur_end = st, en
+        elif en > cur_end:
+            cur_end = en
+    if cur_end is not None:
+        total += cur_end - cur_start
+    return total
+
+
+def _lsum(terms: List[Any]):
+    """Flat LinearExpr.Sum over the terms (plain 0 when empty) instead of chained Python additions."""
+    return cp_model.LinearExpr.Sum(terms) if terms else 0
+
+
 def _shift_key(sh: dict) -> str:
     return f"{sh['date']}|{sh['location']}|{sh['start']}-{sh['end']}"
 
 
-def run_solver(emp_availability: List[Dict[str, Any]], demand: List[Dict[str, Any]],
-               time_limit_sec: float = 10.0, workers: int = 8) -> Dict[str, Any]:
-    """
-    Compute schedule using the same logic as schedule/or_tools_test.py but as a pure function.
+@lru_cache(maxsize=64)
+def _prepare_demand(demand_key: Tuple[Tuple[Any, ...], ...]):
+    """Original shifts, their slices, slice indices per shift and shift index by (date, location, start, end),
+    plus slice bounds as parallel int lists: overall (start, end) and per date (indices, starts, ends).
 
-    Inputs must match donkey_ai JSON structures:
-    - emp_availability: list of dicts with keys: employee_id, date, experienced, hours_min, hours_max, available_slots
-    - demand: list of dicts with keys: date, location, start, end, demand, needs_experienced (optional)
-
-    Returns dict with keys:
-    - assignments: list[dict] with keys: date, location, start, end, demand, assigned_employees, needs_experienced, missing_minutes
-    - uncovered: list[dict]
-    - hours_summary: list[dict]
+    `demand_key` holds (date, location, start, end, demand, needs_experienced) per demand row.
+    Rows for the same (date, location, start, end) are one shift: their demand is summed and
+    needs_experienced is set if any of them sets it. Shifts keep the order of first appearance.
     """
     # Prepare original shifts
     orig_shifts: List[Dict[str, Any]] = []
-    for sh in demand:
-        s = dict(sh)
+    orig_by_key: Dict[Tuple[Any, Any, Any, Any], int] = {}
+    for date, location, start, end, dmd, needs_exp in demand_key:
+        k = orig_by_key.get((date, location, start, end))
+        if k is not None:
+            s = orig_shifts[k]
+            s["demand"] = int(s["demand"]) + int(dmd)
+            s["needs_experienced"] = s["needs_experienced"] or needs_exp
+            continue
+        orig_by_key[(date, location, start, end)] = len(orig_shifts)
+        s = {"date": date, "location": location, "start": start, "end": end, "demand": dmd}
         s["start_min"] = _to_minutes(s["start"])
         s["end_min"] = _to_minutes(s["end"])
         s["dur_min"] = s["end_min"] - s["start_min"]
         s["id"] = _shift_key(s)
-        s["needs_experienced"] = bool(s.get("needs_experienced", False))
+        s["needs_experienced"] = needs_exp
         orig_shifts.append(s)
 
-    # Build slices (30 min)
+    # Build slices (30 min); employees, slices and original shifts are addressed by list index below
     slices: List[Dict[str, Any]] = []
-    slices_by_orig: Dict[str, List[Dict[str, Any]]] = {}
-    for s in orig_shifts:
+    slices_of_orig: List[List[int]] = []
+    for k, s in enumerate(orig_shifts):
+        own: List[int] = []
         t = s["start_min"]
         while t < s["end_min"]:
             t2 = min(t + SLICE_MIN, s["end_min"])
             sl = {
                 "date": s["date"],
                 "location": s["location"],
-                "start": f"{t//60:02d}:{t%60:02d}",
-                "end": f"{t2//60:02d}:{t2%60:02d}",
+                "start": _HHMM_BY_MIN[t] if 0 <= t <= 1440 else f"{t//60:02d}:{t%60:02d}",
+                "end": _HHMM_BY_MIN[t2] if 0 <= t2 <= 1440 else f"{t2//60:02d}:{t2%60:02d}",
                 "start_min": t,
                 "end_min": t2,
                 "dur_min": t2 - t,
                 "demand": int(s["demand"]),
                 "needs_experienced": s["needs_experienced"],
                 "orig_id": s["id"],
+                "orig_idx": k,
             }
             sl["id"] = f"{s['id']}#{t}-{t2}"
+            own.append(len(slices))
             slices.append(sl)
-            slices_by_orig.setdefault(s["id"], []).append(sl)
             t = t2
+        slices_of_orig.append(own)
+
+    # the hot loops below only need slice bounds; keep them out of the per-slice dicts
+    slice_start = [sl["start_min"] for sl in slices]
+    slice_end = [sl["end_min"] for sl in slices]
+    day_slices: Dict[str, Tuple[List[int], List[int], List[int]]] = {}
+    for j, sl in enumerate(slices):
+        js, starts, ends = day_slices.setdefault(sl["date"], ([], [], []))
+        js.append(j)
+        starts.append(slice_start[j])
+        ends.append(slice_end[j])
+    return orig_shifts, slices, slices_of_orig, orig_by_key, slice_start, slice_end, day_slices
+
+
+def _solve_days_separately(emp_availability: List[Dict[str, Any]], demand: List[Dict[str, Any]],
+                           employees: Dict[str, Dict[str, Any]], emps: List[str], employee_names: Dict[str, str],
+                           time_limit_sec: float, workers: int, log_search_progress: bool,
+                           first_feasible: bool, gap: Optional[float]) -> Dict[str, Any]:
+    """Solve each date with its own run_solver call (in threads; CP-SAT releases the GIL) and merge.
+
+    Only valid when hours_min/hours_max cannot bind, see run_solver. The merged result has the same
+    shape and order as a single solve: assignments/uncovered follow the shifts of `demand`, hours_summary covers
+    every employee with totals summed over the days.
+
+    With more dates than threads the days run in rounds, so each day gets time_limit_sec divided by
+    the number of rounds; the whole call stays within the caller's time limit.
+    """
+    demand_by_date: Dict[str, List[Dict[str, Any]]] = {}
+    for sh in demand:
+        demand_by_date.setdefault(sh["date"], []).append(sh)
+    avail_by_date: Dict[str, List[Dict[str, Any]]] = {}
+    for rec in emp_availability:
+        if rec["date"] in demand_by_date:
+            avail_by_date.setdefault(rec["date"], []).append(rec)
+
+    dates = list(demand_by_date)
+    threads = max(1, min(len(dates), int(workers)))
+    day_workers = max(1, int(workers) // threads)
+    rounds = -(-len(dates) // threads)
+    day_limit = float(time_limit_sec) / rounds
+
+    def solve_day(date: str) -> Dict[str, Any]:
+        return run_solver(
+            avail_by_date.get(date, []), demand_by_date[date],
+            time_limit_sec=day_limit, workers=day_workers, log_search_progress=log_search_progress,
+            first_feasible=first_feasible, gap=gap,
+        )
+
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        day_results = dict(zip(dates, pool.map(solve_day, dates)))
+
+    assignments = {d: iter(r["assignments"]) for d, r in day_results.items()}
+    uncovered = {d: iter(r["uncovered"]) for d, r in day_results.items()}
+    result: Dict[str, Any] = {"assignments": [], "uncovered": [], "hours_summary": []}
+    worked_min = dict.fromkeys(emps, 0)
+    seen = set()
+    for sh in demand:
+        # duplicate rows were merged into one shift by the per-day solve
+        key = (sh["date"], sh["location"], sh["start"], sh["end"])
+        if key in seen:
+            continue
+        seen.add(key)
+        date = sh["date"]
+        a = next(assignments[date])
+        for det in a["assigned_employees_detail"]:
+            # names as resolved over the whole input, not just that day's records
+            det["employee_name"] = employee_names.get(det["employee_id"], "")
+            worked_min[det["employee_id"]] += det["minutes"]
+        result["assignments"].append(a)
+        if a["missing_minutes"] > 0:
+            result["uncovered"].append(next(uncovered[date]))
+
+    for e in emps:
+        result["hours_summary"].append({
+            "employee_id": e,
+            "experienced": bool(employees[e]["experienced"]),
+            "total_hours": round(worked_min[e] / 60.0, 2),
+            "hours_min": int(employees[e]["hours_min"]),
+            "hours_max": int(employees[e]["hours_max"]),
+            "over_hours": 0.0,
+            "under_hours": 0.0,
+        })
+    return result
+
+
+def run_solver(emp_availability: List[Dict[str, Any]], demand: List[Dict[str, Any]],
+               time_limit_sec: float = 10.0, workers: int = 8,
+               log_search_progress: bool = False, first_feasible: bool = False,
+               gap: Optional[float] = None, *, solver: Optional[cp_model.CpSolver] = None,
+               split_days: bool = False) -> Dict[str, Any]:
+    """
+    Compute schedule using the same logic as schedule/or_tools_test.py but as a pure function.
+
+    Inputs must match donkey_ai JSON structures:
+    - emp_availability: list of dicts with keys: employee_id, date, experienced, hours_min, hours_max, available_slots
+      (slots as {"start": "HH:MM", "end": "HH:MM"} dicts or pre-parsed Slot instances)
+    - demand: list of dicts with keys: date, location, start, end, demand, needs_experienced (optional)
+
+    Returns dict with keys:
+    - assignments: list[dict] with keys: date, location, start, end, demand, assigned_employees, needs_experienced, missing_minutes
+    - uncovered: list[dict]
+    - hours_summary: list[dict]
+
+    `workers` is passed to CP-SAT as-is: 8 (the default) runs the full portfolio, including the
+    core/LP-based subsolvers that prove optimality on this model; 1 gives a deterministic search.
+
+    For interactive callers: `first_feasible=True` returns the first schedule found instead of
+    proving optimality, and `gap` (e.g. 0.05) stops once the objective is within that relative gap
+    of the best bound. Both leave the result shape unchanged; only its quality may differ.
+
+    `solver` lets callers that solve many small models (e.g. tests) reuse one CpSolver instead of
+    creating one per call. Its parameters are overwritten from the arguments above on every call, and
+    the input is solved as a single model (no per-day threads sharing it).
+
+    `split_days=True` solves each date as its own model (in parallel, sharing `workers` and
+    `time_limit_sec`) when hours bounds cannot link the dates. Off by default: each day then runs
+    with fewer CP-SAT workers, which can change the search and the schedule found.
+    """
+    # Original shifts, their 30 min slices and the confirmed-assignment lookup depend on `demand` only
+    # (repeated demand, e.g. one template per day, reuses them; treat them as read-only)
+    demand_key = tuple(
+        (sh["date"], sh["location"], sh["start"], sh["end"], sh["demand"], bool(sh.get("needs_experienced", False)))
+        for sh in demand
+    )
+    try:
+        prepared = _prepare_demand(demand_key)
+    except TypeError:
+        # unhashable field values: build without the cache
+        prepared = _prepare_demand.__wrapped__(demand_key)
+    orig_shifts, slices, slices_of_orig, orig_by_key, slice_start, slice_end, day_slices = prepared
 
     shifts = slices
-    emps: List[str] = []
     employees: Dict[str, Dict[str, Any]] = {}
     employee_names: Dict[str, str] = {}
     availability: Dict[Tuple[str, str], List[Tuple[int, int]]] = {}
-    preassign_orig: Dict[Tuple[str, str], bool] = {}
+    preassign_orig: set[Tuple[str, int]] = set()
 
     # Aggregate availability per employee/date; keep tightest hour bounds
     for rec in emp_availability:
@@ -103,6 +276,9 @@ def run_solver(emp_availability: List[Dict[str, Any]], demand: List[Dict[str, An
         key = (emp, rec["date"])  # (employee_id, date)
         availability.setdefault(key, [])
         for slot in rec.get("available_slots", []) or []:
+            if isinstance(slot, Slot):
+                availability[key].append((slot.start_min, slot.end_min))
+                continue
             try:
                 availability[key].append((_to_minutes(slot["start"]), _to_minutes(slot["end"])))
             except Exception:
@@ -111,168 +287,240 @@ def run_solver(emp_availability: List[Dict[str, Any]], demand: List[Dict[str, An
         # Handle preassigned confirmed shift if present and identical to an original shift
         asg = (rec.get("assigned_shift") or {})
         if isinstance(asg, dict) and asg.get("confirmed", False):
-            asg_norm = {
-                "date": rec["date"],
-                "location": asg.get("location"),
-                "start": asg.get("start"),
-                "end": asg.get("end"),
-            }
-            for s0 in orig_shifts:
-                if (
-                    s0["date"] == asg_norm["date"]
-                    and s0["location"] == asg_norm["location"]
-                    and s0["start"] == asg_norm["start"]
-                    and s0["end"] == asg_norm["end"]
-                ):
-                    preassign_orig[(emp, s0["id"])] = True
+            asg_key = (rec["date"], asg.get("location"), asg.get("start"), asg.get("end"))
+            try:
+                k = orig_by_key.get(asg_key)
+                if k is not None:
+                    preassign_orig.add((emp, k))
+            except TypeError:
+                # unhashable values in assigned_shift cannot match any shift
+                pass
 
     emps = sorted(employees.keys())
-    shift_ids = [s["id"] for s in shifts]
-    idx_by_id = {s["id"]: i for i, s in enumerate(shifts)}
-
-    # Expand preassign to slices
-    preassign_slices: Dict[Tuple[str, str], bool] = {}
-    for (e, orig_id), val in list(preassign_orig.items()):
-        if val:
-            for sl in slices_by_orig.get(orig_id, []):
-                preassign_slices[(e, sl["id"])] = True
-
-    # Allowed matrix
-    allowed: Dict[Tuple[str, str], bool] = {(e, s["id"]): False for e in emps for s in shifts}
-    for e in emps:
-        for s in shifts:
-            slots = availability.get((e, s["date"]), [])
-            ok = any(_contains(a, b, s["start_min"], s["end_min"]) for (a, b) in slots)
-            if preassign_slices.get((e, s["id"])):
-                ok = True
-            allowed[(e, s["id"])] = ok
+    if not orig_shifts:
+        # nothing to staff: no model to build, everyone works 0 minutes (the optimum the solver would report)
+        return {"assignments": [], "uncovered": [], "hours_summary": [
+            {
+                "employee_id": e,
+                "experienced": bool(employees[e]["experienced"]),
+                "total_hours": 0.0,
+                "hours_min": int(employees[e]["hours_min"]),
+                "hours_max": int(employees[e]["hours_max"]),
+                "over_hours": 0.0,
+                "under_hours": max(0, int(employees[e]["hours_min"]) * 60) / 60.0,
+            }
+            for e in emps
+        ]}
+    E, S, K = len(emps), len(shifts), len(orig_shifts)
+    emp_idx = {e: i for i, e in enumerate(emps)}
+    dur = [s["dur_min"] for s in shifts]
+    preassign = sorted((emp_idx[e], k) for e, k in preassign_orig)
+
+    # Allowed (employee, slice) pairs: only slices on dates the employee actually has slots for are checked
+    allowed = [[False] * S for _ in range(E)]
+    for (e, date), slots in availability.items():
+        day = day_slices.get(date)
+        if not slots or day is None:
+            continue
+        # a slice is allowed when a single slot contains it. With slots sorted by start, the slots
+        # starting at or before the slice are a prefix; the farthest end among them decides.
+        # (Slots are not merged: a slice spanning two adjacent slots stays disallowed.)
+        slots.sort()
+        starts = [a for a, _ in slots]
+        reach: List[int] = []
+        farthest = -1
+        for _, b in slots:
+            farthest = max(farthest, b)
+            reach.append(farthest)
+        row = allowed[emp_idx[e]]
+        for j, st, en in zip(*day):
+            i = bisect_right(starts, st) - 1
+            if i >= 0 and reach[i] >= en:
+                row[j] = True
+    for ei, k in preassign:
+        for j in slices_of_orig[k]:
+            allowed[ei][j] = True
+    # candidates per slice (in employee order) and per employee (in slice order)
+    cand_emps: List[List[int]] = [[] for _ in range(S)]
+    cand_slices: List[List[int]] = []
+    for ei, row in enumerate(allowed):
+        js = [j for j, ok in enumerate(row) if ok]
+        cand_slices.append(js)
+        for j in js:
+            cand_emps[j].append(ei)
+
+    # Hours bounds are the only link between dates. When they cannot bind (no minimum, and even all
+    # candidate slices together fit under the maximum) every date is an independent, smaller model.
+    if split_days and solver is None and len({s0["date"] for s0 in orig_shifts}) > 1 and all(
+        employees[e]["hours_min"] <= 0
+        and sum(dur[j] for j in cand_slices[ei]) <= employees[e]["hours_max"] * 60
+        for ei, e in enumerate(emps)
+    ):
+        return _solve_days_separately(
+            emp_availability, demand, employees, emps, employee_names,
+            time_limit_sec, workers, log_search_progress, first_feasible, gap,
+        )
 
     # Build CP-SAT model — identical constraints as in or_tools_test
     m = cp_model.CpModel()
 
-    # decision x[e,s]
-    x: Dict[Tuple[str, str], Any] = {}
-    for e in emps:
-        for s in shifts:
-            if allowed[(e, s["id"])]:
-                x[(e, s["id"])] = m.NewBoolVar(f"x_{e}_{s['id']}")
-            else:
-                x[(e, s["id"])] = m.NewConstant(0)
-
-    # Preassign slices
-    for (e, sid), val in preassign_slices.items():
-        if val:
-            m.Add(x[(e, sid)] == 1)
-
-    # per-original shift selection
-    allowed_orig: Dict[Tuple[str, str], bool] = {}
-    for e in emps:
-        for s0 in orig_shifts:
-            orig_id = s0["id"]
-            any_ok = preassign_orig.get((e, orig_id), False)
-            if not any_ok:
-                for sl in slices_by_orig.get(orig_id, []):
-                    if allowed[(e, sl["id"])]:
-                        any_ok = True
-                        break
-            allowed_orig[(e, orig_id)] = any_ok
-
-    y: Dict[Tuple[str, str], Any] = {}
-    for e in emps:
-        for s0 in orig_shifts:
-            orig_id = s0["id"]
-            if allowed_orig[(e, orig_id)]:
-                y[(e, orig_id)] = m.NewBoolVar(f"y_{e}_{orig_id}")
-            else:
-                y[(e, orig_id)] = m.NewConstant(0)
+    # decision x[e][s]; None where the employee cannot take the slice (a fixed 0)
+    x: List[List[Any]] = [[None] * S for _ in range(E)]
+    for j, s in enumerate(shifts):
+        for ei in cand_emps[j]:
+            x[ei][j] = m.NewBoolVar(f"x_{emps[ei]}_{s['id']}")
+
+    # Preassign slices (hinted as well, so the first solutions already contain them)
+    for ei, k in preassign:
+        for j in slices_of_orig[k]:
+            m.Add(x[ei][j] == 1)
+            m.AddHint(x[ei][j], 1)
+
+    # per-original shift selection y[e][k]
+    y: List[List[Any]] = [[None] * K for _ in range(E)]
+    preassign_set = set(preassign)
+    for ei in range(E):
+        row = allowed[ei]
+        for k, s0 in enumerate(orig_shifts):
+            if (ei, k) in preassign_set or any(row[j] for j in slices_of_orig[k]):
+                y[ei][k] = m.NewBoolVar(f"y_{emps[ei]}_{s0['id']}")
 
     # Preassign y for confirmed originals
-    for (e, orig_id), val in preassign_orig.items():
-        if val:
-            m.Add(y[(e, orig_id)] == 1)
+    for ei, k in preassign:
+        m.Add(y[ei][k] == 1)
+        m.AddHint(y[ei][k], 1)
 
     # At most demand distinct employees for an original shift
-    for s0 in orig_shifts:
-        orig_id = s0["id"]
-        m.Add(sum(y[(e, orig_id)] for e in emps) <= int(s0["demand"]))
+    for k, s0 in enumerate(orig_shifts):
+        ys = [y[ei][k] for ei in range(E) if y[ei][k] is not None]
+        if ys:
+            m.Add(cp_model.LinearExpr.Sum(ys) <= int(s0["demand"]))
 
     # Link x and y
-    for e in emps:
-        for sl in slices:
-            m.Add(x[(e, sl["id"])] <= y[(e, sl["orig_id"])])
+    for j, sl in enumerate(slices):
+        k = sl["orig_idx"]
+        for ei in cand_emps[j]:
+            m.Add(x[ei][j] <= y[ei][k])
 
     # Tighten: if selected for original, must cover >= 1 of its slices
-    for e in emps:
-        for s0 in orig_shifts:
-            orig_id = s0["id"]
-            sl_list = slices_by_orig.get(orig_id, [])
-            if sl_list:
-                m.Add(sum(x[(e, sl["id"])] for sl in sl_list) >= y[(e, orig_id)])
-
-    # Coverage per slice; experienced when staffed
-    under: Dict[str, Any] = {}
-    is_staffed: Dict[str, Any] = {}
-    for s in shifts:
-        sid = s["id"]
-        assigned_sum = sum(x[(e, sid)] for e in emps)
+    for ei in range(E):
+        for k in range(K):
+            if y[ei][k] is None:
+                continue
+            xs = [x[ei][j] for j in slices_of_orig[k] if x[ei][j] is not None]
+            m.Add(_lsum(xs) >= y[ei][k])
+
+    # Coverage per slice. needs_experienced is a soft preference (a shift is better staffed by anyone
+    # than left empty), so it adds no constraint here; the former is_staffed/exp_sum pair never bound.
+    # Slices nobody can take stay fully uncovered whatever the solver does; their shortfall is a constant
+    # of the objective, so they get no variable at all (the result reports them from the empty decisions).
+    under: List[Any] = []
+    for j, s in enumerate(shifts):
+        if not cand_emps[j]:
+            continue
+        assigned_sum = cp_model.LinearExpr.Sum([x[ei][j] for ei in cand_emps[j]])
         m.Add(assigned_sum <= int(s["demand"]))
-        under[sid] = m.NewIntVar(0, int(s["demand"]), f"under_{sid}")
-        m.Add(under[sid] >= int(s["demand"]) - assigned_sum)
-        is_staffed[sid] = m.NewBoolVar(f"staffed_{sid}")
-        m.Add(assigned_sum >= is_staffed[sid])
-        if s.get("needs_experienced", False):
-            exp_sum = sum(x[(e, sid)] for e in emps if employees[e]["experienced"] and allowed[(e, sid)])
-            m.Add(exp_sum >= is_staffed[sid])
-
-    # No overlapping per employee per day
-    for e in emps:
-        by_date: Dict[str, List[Dict[str, Any]]] = {}
-        for s in shifts:
-            by_date.setdefault(s["date"], []).append(s)
-        for date, slist in by_date.items():
-            for s1, s2 in itertools.combinations(slist, 2):
-                if _overlaps(s1["start_min"], s1["end_min"], s2["start_min"], s2["end_min"]):
-                    m.Add(x[(e, s1["id"]) ] + x[(e, s2["id"]) ] <= 1)
+        u = m.NewIntVar(0, int(s["demand"]), f"under_{s['id']}")
+        m.Add(u >= int(s["demand"]) - assigned_sum)
+        under.append(u)
+
+    # No overlapping per employee per day: each candidate slice is an optional fixed interval present iff x
+    for ei in range(E):
+        by_day: Dict[str, List[int]] = {}
+        for j in cand_slices[ei]:
+            by_day.setdefault(shifts[j]["date"], []).append(j)
+        for date, js in by_day.items():
+            if len(js) < 2:
+                continue
+            m.AddNoOverlap([
+                m.NewOptionalFixedSizeIntervalVar(
+                    slice_start[j], dur[j], x[ei][j], f"iv_{emps[ei]}_{shifts[j]['id']}"
+                )
+                for j in js
+            ])
+            # redundant: worked minutes that day cannot exceed the length of the union of its candidate slices
+            cap = _union_minutes([(slice_start[j], slice_end[j]) for j in js])
+            if cap < sum(dur[j] for j in js):
+                m.Add(cp_model.LinearExpr.WeightedSum([x[ei][j] for j in js], [dur[j] for j in js]) <= cap)
 
     # Hours per employee
-    over: Dict[str, Any] = {}
-    under_hours: Dict[str, Any] = {}
-    for e in emps:
-        tot = m.NewIntVar(0, 7*24*60, f"totmin_{e}")
-        m.Add(tot == sum(shifts[idx_by_id[sid]]["dur_min"] * x[(e, sid)] for sid in shift_ids))
+    over: List[Any] = []
+    under_hours: List[Any] = []
+    tots: List[Any] = []
+    for ei, e in enumerate(emps):
+        # domains bounded by what the employee could possibly work, not a whole week
+        js = cand_slices[ei]
+        possible = sum(dur[j] for j in js)
+        tot = m.NewIntVar(0, possible, f"totmin_{e}")
+        tots.append(tot)
+        if js:
+            m.Add(tot == cp_model.LinearExpr.WeightedSum([x[ei][j] for j in js], [dur[j] for j in js]))
+        else:
+            m.Add(tot == 0)
         max_min = int(employees[e]["hours_max"]) * 60
         min_min = int(employees[e]["hours_min"]) * 60
-        over[e] = m.NewIntVar(0, 7*24*60, f"over_{e}")
-        under_hours[e] = m.NewIntVar(0, 7*24*60, f"underh_{e}")
-        m.Add(tot <= max_min + over[e])
-        m.Add(tot + under_hours[e] >= min_min)
+        over.append(m.NewIntVar(0, max(0, possible - max_min), f"over_{e}"))
+        under_hours.append(m.NewIntVar(0, max(0, min_min), f"underh_{e}"))
+        m.Add(tot <= max_min + over[ei])
+        m.Add(tot + under_hours[ei] >= min_min)
+
+    # Symmetry breaking: employees with the same candidate slices and hour bounds (and no confirmed
+    # shift) are interchangeable, so any solution can be permuted to list them by worked minutes
+    preassigned_emps = {ei for ei, _ in preassign}
+    classes: Dict[Tuple[Any, ...], List[int]] = {}
+    for ei, e in enumerate(emps):
+        if ei in preassigned_emps or not cand_slices[ei]:
+            continue
+        emp = employees[e]
+        sig = (tuple(cand_slices[ei]), emp["experienced"], emp["hours_min"], emp["hours_max"])
+        classes.setdefault(sig, []).append(ei)
+    for members in classes.values():
+        for a, b in zip(members, members[1:]):
+            m.Add(tots[a] >= tots[b])
 
     # Objective
-    obj = []
-    obj += [1000 * under[sid] for sid in shift_ids]
-    obj += [10 * over[e] for e in emps]
-    obj += [1 * under_hours[e] for e in emps]
-    m.Minimize(sum(obj))
+    obj_vars = under + over + under_hours
+    obj_coeffs = [1000] * len(under) + [10] * len(over) + [1] * len(under_hours)
+    m.Minimize(cp_model.LinearExpr.WeightedSum(obj_vars, obj_coeffs))
 
     # Solve
-    solver = cp_model.CpSolver()
+    if solver is None:
+        solver = cp_model.CpSolver()
     solver.parameters.max_time_in_seconds = float(time_limit_sec)
     solver.parameters.num_search_workers = int(workers)
+    # the model is mostly linear (coverage/hours); a stronger LP relaxation pays off
+    solver.parameters.linearization_level = 2
+    solver.parameters.log_search_progress = bool(log_search_progress)
+    solver.parameters.cp_model_presolve = True
+    solver.parameters.symmetry_level = 2
+    solver.parameters.stop_after_first_solution = bool(first_feasible)
+    # always set: a reused solver may still carry the gap of an earlier call (0.0 is the CP-SAT default)
+    solver.parameters.relative_gap_limit = float(gap) if gap else 0.0
     status = solver.Solve(m)
 
+    # read every decision once: employees (indices, in order) working each slice
+    value = solver.BooleanValue
+    on_slice: List[List[int]] = [
+        [ei for ei in cand_emps[j] if value(x[ei][j])] for j in range(S)
+    ]
+    # worked minutes per employee, in the same pass over the decisions
+    worked_min = [0] * E
+    for j, on in enumerate(on_slice):
+        for ei in on:
+            worked_min[ei] += dur[j]
+
     # Build result
     result: Dict[str, Any] = {"assignments": [], "uncovered": [], "hours_summary": []}
 
-    for s0 in orig_shifts:
+    for k, s0 in enumerate(orig_shifts):
         sid0 = s0["id"]
-        sl_list = slices_by_orig.get(sid0, [])
         assigned_set = set()
         covered_person_min = 0
         per_emp_slices: Dict[str, List[Tuple[int, int]]] = {}
         missing_slices: List[Tuple[int, int, int]] = []
-        for sl in sl_list:
-            sid = sl["id"]
-            assigned_here = [e for e in emps if solver.Value(x[(e, sid)]) == 1]
+        for j in slices_of_orig[k]:
+            sl = shifts[j]
+            assigned_here = [emps[ei] for ei in on_slice[j]]
             for e in assigned_here:
                 assigned_set.add(e)
                 per_emp_slices.setdefault(e, []).append((sl["start_min"], sl["end_min"]))
@@ -304,12 +552,12 @@ def run_solver(emp_availability: List[Dict[str, Any]], demand: List[Dict[str, An
             for start_min, end_min in merged:
                 start = _to_hhmm(start_min)
                 end = _to_hhmm(end_min)
-                dur = max(0, end_min - start_min)
-                total_emp_min += dur
+                seg_min = max(0, end_min - start_min)
+                total_emp_min += seg_min
                 segments_fmt.append({
                     "start": start,
                     "end": end,
-                    "minutes": dur,
+                    "minutes": seg_min,
                 })
 
             if segments_fmt:
@@ -367,19 +615,15 @@ def run_solver(emp_availability: List[Dict[str, Any]], demand: List[Dict[str, An
                 "missing_segments": missing_segments,
             })
 
-    for e in emps:
-        tot_minutes = 0
-        for s in shifts:
-            if solver.Value(x[(e, s["id"])]) == 1:
-                tot_minutes += s["dur_min"]
+    for ei, e in enumerate(emps):
         result["hours_summary"].append({
             "employee_id": e,
             "experienced": bool(employees[e]["experienced"]),
-            "total_hours": round(tot_minutes / 60.0, 2),
+            "total_hours": round(worked_min[ei] / 60.0, 2),
             "hours_min": int(employees[e]["hours_min"]),
             "hours_max": int(employees[e]["hours_max"]),
-            "over_hours": solver.Value(over[e]) / 60.0,
-            "under_hours": solver.Value(under_hours[e]) / 60.0,
+            "over_hours": solver.Value(over[ei]) / 60.0,
+            "under_hours": solver.Value(under_hours[ei]) / 60.0,
         })
 
     return result
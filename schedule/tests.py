@@ -1,20 +1,26 @@
 from types import SimpleNamespace
 from datetime import date
 
+from django.db import connection
 from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 
 from accounts.models import Company, User
-from schedule.models import DefaultDemand, CompanyLocation, Availability, Demand
+from schedule.models import DefaultDemand, CompanyLocation, Availability, Demand, EventRule, SpecialDay
 from schedule.api import (
     _get_default_template,
+    _build_default_week,
+    _load_default_templates,
+    _resolve_default_template,
     save_default_demand,
     save_default_demand_bulk,
     list_locations,
     create_location,
     get_default_demand_week,
     _ensure_schedule_for_demand,
+    _apply_special_rules_to_demand,
 )
-from schedule.solver import run_solver
+from schedule.solver import run_solver, slot_from_hhmm
 from schedule.schemas import (
     DemandShiftTemplateIn,
     DefaultDemandIn,
@@ -23,19 +29,25 @@ from schedule.schemas import (
     CompanyLocationIn,
 )
 
+# password hashing strength is irrelevant for fixtures and the default hasher dominates create_user
+FAST_PASSWORD_HASHERS = ["django.contrib.auth.hashers.MD5PasswordHasher"]
 
-@override_settings(DATABASES={"default": {"ENGINE": "django.db.backends.sqlite3", "NAME": ":memory:"}})
+
+@override_settings(PASSWORD_HASHERS=FAST_PASSWORD_HASHERS)
 class DefaultDemandTests(TestCase):
-    def setUp(self):
-        self.company = Company.objects.create(name="Acme", code="ACME1234")
-        self.user = User.objects.create_user(
+    @classmethod
+    def setUpTestData(cls):
+        cls.company = Company.objects.create(name="Acme", code="ACME1234")
+        cls.user = User.objects.create_user(
             email="owner@acme.test",
             password="secret",
             first_name="Owner",
             last_name="User",
             role="owner",
-            company=self.company,
+            company=cls.company,
         )
+
+    def setUp(self):
         self.request = SimpleNamespace(user=self.user, auth=None)
 
     def test_save_default_demand_stores_weekday(self):
@@ -52,6 +64,7 @@ class DefaultDemandTests(TestCase):
         self.assertEqual(stored.company, self.company)
         self.assertEqual(stored.weekday, 2)
         self.assertEqual(stored.items[0]["start"], "08:00")
+        self.assertEqual(stored.items_canonical, stored.items)
         self.assertTrue(CompanyLocation.objects.filter(company=self.company, name="Main").exists())
         self.assertEqual(response["defaults"][0]["weekday"], 2)
         self.assertEqual(response["defaults"][0]["items"][0]["demand"], 2)
@@ -61,14 +74,28 @@ class DefaultDemandTests(TestCase):
         DefaultDemand.objects.create(company=self.company, location="HQ", weekday=None, items=[{"start": "09:00", "end": "17:00", "demand": 1, "needs_experienced": False}])
         DefaultDemand.objects.create(company=self.company, location="HQ", weekday=0, items=[{"start": "06:00", "end": "14:00", "demand": 2, "needs_experienced": True}])
 
-        monday_template = _get_default_template(self.company, "HQ", 0)
-        tuesday_template = _get_default_template(self.company, "HQ", 1)
+        with self.assertNumQueries(1):
+            monday_template = _get_default_template(self.company, "HQ", 0)
+        with self.assertNumQueries(1):
+            tuesday_template = _get_default_template(self.company, "HQ", 1)
 
         self.assertEqual(monday_template[0]["start"], "06:00")
         self.assertEqual(monday_template[0]["demand"], 2)
         self.assertEqual(tuesday_template[0]["start"], "09:00")
         self.assertEqual(tuesday_template[0]["demand"], 1)
 
+    def test_load_default_templates_reads_all_weekdays_at_once(self):
+        DefaultDemand.objects.create(company=self.company, location="HQ", weekday=None, items=[{"start": "9", "end": "17", "demand": 1}])
+        DefaultDemand.objects.create(company=self.company, location="HQ", weekday=4, items=[{"start": "06:00", "end": "14:00", "demand": 3, "needs_experienced": True}])
+
+        with self.assertNumQueries(1):
+            templates = _load_default_templates(self.company, "HQ")
+
+        self.assertEqual(set(templates), {None, 4})
+        self.assertEqual(templates[None][0]["start"], "09:00")
+        self.assertEqual(_resolve_default_template(templates, 4)[0]["demand"], 3)
+        self.assertEqual(_resolve_default_template(templates, 5), templates[None])
+
     def test_save_default_demand_bulk_creates_multiple_days(self):
         payload = DefaultDemandBulkIn(
             location="Warehouse",
@@ -96,6 +123,28 @@ class DefaultDemandTests(TestCase):
         self.assertEqual(defaults[1]["items"][0]["demand"], 3)
         self.assertEqual(DefaultDemand.objects.filter(company=self.company, location="Warehouse").count(), 2)
 
+    def test_save_default_demand_bulk_queries_do_not_grow_with_days(self):
+        CompanyLocation.objects.create(company=self.company, name="Main")
+
+        def payload(weekdays):
+            return DefaultDemandBulkIn(
+                location="Main",
+                defaults=[
+                    DefaultDemandDayIn(weekday=wd, items=[DemandShiftTemplateIn(start="08:00", end="12:00", demand=wd + 1)])
+                    for wd in weekdays
+                ],
+            )
+
+        with CaptureQueriesContext(connection) as one_day:
+            save_default_demand_bulk(SimpleNamespace(user=self.user, auth=None), payload([0]))
+        # weekday 0 is updated, 1-6 are inserted, all in the same statement
+        with CaptureQueriesContext(connection) as week:
+            response = save_default_demand_bulk(SimpleNamespace(user=self.user, auth=None), payload(range(7)))
+
+        self.assertEqual(len(week.captured_queries), len(one_day.captured_queries))
+        self.assertEqual(DefaultDemand.objects.filter(company=self.company, location="Main").count(), 7)
+        self.assertEqual([entry["items"][0]["demand"] for entry in response["defaults"]], list(range(1, 8)))
+
     def test_list_locations_returns_only_company_entries(self):
         own = CompanyLocation.objects.create(company=self.company, name="Main")
         other_company = Company.objects.create(name="Other", code="OTHER001")
@@ -143,42 +192,53 @@ class DefaultDemandTests(TestCase):
         self.assertTrue(defaults[3]["inherited"])
         self.assertEqual(defaults[3]["items"][0]["demand"], 2)
 
-
-@override_settings(DATABASES={"default": {"ENGINE": "django.db.backends.sqlite3", "NAME": ":memory:"}})
+    def test_default_week_without_templates_is_empty_after_one_query(self):
+        DefaultDemand.objects.create(company=self.company, location="Other", weekday=1, items=[{"start": "08:00", "end": "12:00", "demand": 1}])
+
+        with self.assertNumQueries(1):
+            week = _build_default_week(self.company, "HQ")
+
+        self.assertEqual([entry["weekday"] for entry in week], list(range(7)))
+        self.assertTrue(all(entry["items"] == [] and not entry["inherited"] for entry in week))
+
+
+# run_solver only reads its inputs, so the fixtures are shared as-is
+_SOLVER_AVAILABILITY = [
+    {
+        "employee_id": "1",
+        "employee_name": "Jan",
+        "date": "2025-01-01",
+        "experienced": False,
+        "hours_min": 0,
+        "hours_max": 600,
+        "available_slots": [{"start": "08:00", "end": "10:00"}],
+    },
+    {
+        "employee_id": "2",
+        "employee_name": "Ola",
+        "date": "2025-01-01",
+        "experienced": False,
+        "hours_min": 0,
+        "hours_max": 600,
+        "available_slots": [{"start": "09:00", "end": "10:00"}],
+    },
+]
+_SOLVER_DEMAND = [
+    {
+        "date": "2025-01-01",
+        "location": "Main",
+        "start": "08:00",
+        "end": "10:00",
+        "demand": 2,
+        "needs_experienced": False,
+    }
+]
+
+
+@override_settings(PASSWORD_HASHERS=FAST_PASSWORD_HASHERS)
 class SolverResultTests(TestCase):
     def test_run_solver_provides_assignment_details_and_missing_segments(self):
-        emp_availability = [
-            {
-                "employee_id": "1",
-                "employee_name": "Jan",
-                "date": "2025-01-01",
-                "experienced": False,
-                "hours_min": 0,
-                "hours_max": 600,
-                "available_slots": [{"start": "08:00", "end": "10:00"}],
-            },
-            {
-                "employee_id": "2",
-                "employee_name": "Ola",
-                "date": "2025-01-01",
-                "experienced": False,
-                "hours_min": 0,
-                "hours_max": 600,
-                "available_slots": [{"start": "09:00", "end": "10:00"}],
-            },
-        ]
-        demand = [
-            {
-                "date": "2025-01-01",
-                "location": "Main",
-                "start": "08:00",
-                "end": "10:00",
-                "demand": 2,
-                "needs_experienced": False,
-            }
-        ]
-
-        result = run_solver(emp_availability=emp_availability, demand=demand)
+        result = run_solver(emp_availability=_SOLVER_AVAILABILITY, demand=_SOLVER_DEMAND)
 
         self.assertEqual(len(result["assignments"]), 1)
         assignment = result["assignments"][0]
@@ -204,16 +264,66 @@ class SolverResultTests(TestCase):
         self.assertIn("missing_segments", uncovered)
         self.assertEqual(uncovered["missing_segments"][0]["end"], "09:00")
 
+    def test_run_solver_accepts_preparsed_slots(self):
+        parsed = [
+            dict(rec, available_slots=[slot_from_hhmm(slot["start"], slot["end"]) for slot in rec["available_slots"]])
+            for rec in _SOLVER_AVAILABILITY
+        ]
+        self.assertIs(parsed[0]["available_slots"][0], slot_from_hhmm("08:00", "10:00"))
+
+        from_dicts = run_solver(emp_availability=_SOLVER_AVAILABILITY, demand=_SOLVER_DEMAND)
+        from_slots = run_solver(emp_availability=parsed, demand=_SOLVER_DEMAND)
+
+        self.assertEqual(from_slots["assignments"], from_dicts["assignments"])
+        self.assertEqual(from_slots["hours_summary"], from_dicts["hours_summary"])
 
-@override_settings(DATABASES={"default": {"ENGINE": "django.db.backends.sqlite3", "NAME": ":memory:"}})
+    def test_run_solver_merges_duplicate_demand_rows(self):
+        split = [
+            dict(_SOLVER_DEMAND[0], demand=1),
+            dict(_SOLVER_DEMAND[0], demand=1, needs_experienced=True),
+        ]
+        merged = [dict(_SOLVER_DEMAND[0], demand=2, needs_experienced=True)]
+
+        from_split = run_solver(emp_availability=_SOLVER_AVAILABILITY, demand=split, workers=1)
+        from_merged = run_solver(emp_availability=_SOLVER_AVAILABILITY, demand=merged, workers=1)
+
+        self.assertEqual(len(from_split["assignments"]), 1)
+        self.assertEqual(from_split["assignments"][0]["demand"], 2)
+        self.assertTrue(from_split["assignments"][0]["needs_experienced"])
+        self.assertEqual(from_split["assignments"], from_merged["assignments"])
+        self.assertEqual(from_split["hours_summary"], from_merged["hours_summary"])
+
+    def test_run_solver_split_days_matches_single_solve(self):
+        # each day has one staffing that covers the most, so both paths must find the same schedule
+        availability = [
+            dict(_SOLVER_AVAILABILITY[0], date="2025-01-01"),
+            dict(_SOLVER_AVAILABILITY[1], date="2025-01-02"),
+        ]
+        demand = [
+            dict(_SOLVER_DEMAND[0], date="2025-01-01", demand=1),
+            dict(_SOLVER_DEMAND[0], date="2025-01-02"),
+        ]
+
+        single = run_solver(emp_availability=availability, demand=demand, workers=2)
+        per_day = run_solver(emp_availability=availability, demand=demand, workers=2, split_days=True)
+
+        self.assertEqual([a["date"] for a in per_day["assignments"]], ["2025-01-01", "2025-01-02"])
+        self.assertEqual([a["missing_minutes"] for a in per_day["assignments"]], [0, 180])
+        self.assertEqual(per_day["assignments"], single["assignments"])
+        self.assertEqual(per_day["uncovered"], single["uncovered"])
+        self.assertEqual(per_day["hours_summary"], single["hours_summary"])
+
+
+@override_settings(PASSWORD_HASHERS=FAST_PASSWORD_HASHERS)
 class ScheduleDetailPersistenceTests(TestCase):
-    def test_generated_shifts_store_assignment_details(self):
-        shift_date = date(2025, 1, 1)
-        demand = Demand.objects.create(
+    @classmethod
+    def setUpTestData(cls):
+        cls.shift_date = date(2025, 1, 1)
+        cls.demand = Demand.objects.create(
             name="Test",
             raw_payload=[
                 {
-                    "date": shift_date.isoformat(),
+                    "date": cls.shift_date.isoformat(),
                     "location": "Main",
                     "start": "08:00",
                     "end": "10:00",
@@ -222,24 +332,28 @@ class ScheduleDetailPersistenceTests(TestCase):
                 }
             ],
             content_hash="persist-detail-test",
-            date_from=shift_date,
-            date_to=shift_date,
+            date_from=cls.shift_date,
+            date_to=cls.shift_date,
         )
-
         Availability.objects.create(
             employee_id="1",
             employee_name="Jan",
-            date=shift_date,
+            date=cls.shift_date,
             available_slots=[{"start": "08:00", "end": "10:00"}],
         )
         Availability.objects.create(
             employee_id="2",
             employee_name="Ola",
-            date=shift_date,
+            date=cls.shift_date,
             available_slots=[{"start": "09:00", "end": "10:00"}],
         )
 
-        assignments, summary = _ensure_schedule_for_demand(demand, force=True)
+    def test_generated_shifts_store_assignment_details(self):
+        demand = self.demand
+        # delete, availability, rule map, bulk insert, demand update, read-back;
+        # none of them may repeat per shift or per employee
+        with self.assertNumQueries(6):
+            assignments, summary = _ensure_schedule_for_demand(demand, force=True)
 
         self.assertTrue(assignments)
         first = assignments[0]
@@ -253,3 +367,29 @@ class ScheduleDetailPersistenceTests(TestCase):
         meta_details = {entry["employee_id"]: entry for entry in shift.meta["assigned_employees_detail"]}
         self.assertEqual(meta_details["1"]["employee_name"], "Jan")
         self.assertEqual(shift.meta["missing_segments"][0]["missing"], 1)
+
+
+@override_settings(PASSWORD_HASHERS=FAST_PASSWORD_HASHERS)
+class SpecialRulesTests(TestCase):
+    def setUp(self):
+        self.day = date(2025, 12, 24)
+        self.items = [
+            {"date": self.day.isoformat(), "location": "Main", "start": "08:00", "end": "16:00", "demand": 2, "needs_experienced": False},
+        ]
+
+    def test_special_rules_follow_rule_changes(self):
+        rule = EventRule.objects.create(name="Wigilia", mode=EventRule.MODE_OVERRIDE, value=5)
+        SpecialDay.objects.create(date=self.day, location="Main", rule=rule)
+
+        out = _apply_special_rules_to_demand(self.items, self.day, self.day)
+        self.assertEqual(out[0]["demand"], 5)
+        self.assertEqual(self.items[0]["demand"], 2)
+
+        rule.value = 7
+        rule.save()
+        out = _apply_special_rules_to_demand(self.items, self.day, self.day)
+        self.assertEqual(out[0]["demand"], 7)
+
+        SpecialDay.objects.all().delete()
+        out = _apply_special_rules_to_demand(self.items, self.day, self.day)
+        self.assertEqual(out[0]["demand"], 2)